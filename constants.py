@@ -1,8 +1,14 @@
+import numpy as np
+
 # Unit convention
 # time unit is seconds
 # mass unit is kilograms
 # distance unit is pixels
 
+# Floating point precision used for all particle state.
+# Single precision is ample at pixel resolution and halves the memory traffic of FP64.
+DTYPE = np.float32
+
 # PyGame environment constants
 NUM_DIM = 2
 SCREEN_WIDTH = 1280
@@ -22,7 +28,17 @@ G_SCALED = 1000000  # Scaled gravitational constant
 # effectively "softening" the gravitational interaction at very close ranges.
 EPS_SQUARED = (RADIUS / 2)**2
 
+# Integration constants
+PHYSICS_DT = 1.0 / 60  # Fixed physics time step in seconds, decoupled from the render frame rate
+# Physics steps a single frame may catch up on. When the simulation cannot keep up with real time,
+# the time still owed is dropped and it runs in slow motion instead of falling further behind every frame.
+MAX_PHYSICS_STEPS_PER_FRAME = 4
+# Upper bound on a single leapfrog step. It sits well below the close-encounter timescale
+# sqrt(EPS^3 / (G * m)) ~ 3.5e-3 s, below which the fixed-step integrator stays stable.
+MAX_TIME_STEP = 1.0 / 1800
+
 # Logging constants
 ENERGY_LOG_FILENAME = "logs/energy_log.csv" 
 LOG_FREQUENCY_HZ = 10  # How many times per second to log data
-LOG_INTERVAL = 1.0 / LOG_FREQUENCY_HZ 
\ No newline at end of file
+LOG_INTERVAL = 1.0 / LOG_FREQUENCY_HZ 
+LOG_BATCH_SIZE = 100  # Rows buffered in memory before they are written to the log file
@@ -0,0 +1,227 @@
+import math
+import numpy as np
+from numba import njit, prange, get_num_threads
+
+# Every kernel declares an explicit signature and sets `cache=True`: they are compiled eagerly at
+# import time instead of stalling the first frame, and the machine code is persisted to __pycache__
+# so that subsequent runs skip compilation entirely.
+
+@njit("f4(f4)", fastmath=True, inline="always", cache=True)
+def _rsqrt(x: float) -> float:
+    """
+    Reciprocal square root 1 / sqrt(x), inlined into the calling kernel.
+
+    Written as a plain divide-by-sqrt; with `fastmath` enabled, LLVM is free to lower it
+    to the hardware approximate reciprocal square root plus a Newton refinement step
+    instead of a full-precision sqrt followed by a division.
+    """
+    return np.float32(1.0) / math.sqrt(x)
+
+@njit(
+    "f8(f4[::1], f4[::1], f4[::1], f4, f4, f4, f4, f4[:, :, ::1], f4[::1], f4[::1])",
+    parallel=True, fastmath=True, boundscheck=False, cache=True
+)
+def forces_kernel(pos_x: np.ndarray, pos_y: np.ndarray, masses: np.ndarray, width: float, height: float,
+                  G: float, eps_squared: float, scratch: np.ndarray, out_x: np.ndarray, out_y: np.ndarray) -> float:
+    """
+    JIT-compiled kernel computing the net softened gravitational force on every particle,
+    along with the total potential energy of the system.
+
+    Fuses displacement, minimum image convention and force accumulation into a single
+    pass over the unique pairs (i < j), without allocating any intermediate arrays.
+    Newton's third law (F_ji = -F_ij) is used to accumulate each pair force into both
+    particles, halving the pairwise work. The pair potential G * m_i * m_j / r is a
+    by-product of the force calculation, so the potential energy comes at the cost of one
+    extra addition per pair.
+
+    Because pair (i, j) writes to particle j as well, rows are split into one block per
+    thread and each block accumulates into its own private slice of `scratch`; the slices
+    are then reduced into the output buffers in a second, race-free pass. Rows are dealt
+    out to blocks cyclically, since row i only holds N - 1 - i pairs and contiguous
+    blocks would leave the threads owning the last rows mostly idle.
+
+    The inner loop runs over views of the arrays that start at particle i + 1, so that its
+    index starts at zero. LLVM can then prove that no index is negative, drop Numba's
+    wraparound handling and vectorize the loop, including the scatter into particle j,
+    just as it would if the particle count were a compile-time constant.
+
+    All arithmetic is carried out in single precision; literals are typed explicitly
+    so that Numba does not silently promote intermediates to float64. Only the per-row
+    potential energy sums are promoted, so that the energy log keeps its resolution.
+
+    Args:
+        pos_x (np.ndarray): Particle x coordinates, shape (num_particles,).
+        pos_y (np.ndarray): Particle y coordinates, shape (num_particles,).
+        masses (np.ndarray): Particle masses, shape (num_particles,).
+        width (float): Width of the periodic domain.
+        height (float): Height of the periodic domain.
+        G (float): Gravitational constant.
+        eps_squared (float): Squared softening length.
+        scratch (np.ndarray): Per-thread accumulators, shape (2, num_threads, num_particles).
+        out_x (np.ndarray): Output buffer for the x components of the net forces.
+        out_y (np.ndarray): Output buffer for the y components of the net forces.
+
+    Returns:
+        float: The total potential energy of the system.
+    """
+    num_particles = pos_x.shape[0]
+    num_blocks = scratch.shape[1]
+    potential_energy = 0.0
+
+    # the minimum image convention multiplies by these instead of dividing on every pair
+    inv_width = np.float32(1.0) / width
+    inv_height = np.float32(1.0) / height
+
+    # --- Phase 1: each block accumulates the forces of its rows into a private buffer ---
+    for block in prange(num_blocks):
+        acc_x = scratch[0, block]
+        acc_y = scratch[1, block]
+        acc_x[:] = np.float32(0.0)
+        acc_y[:] = np.float32(0.0)
+
+        block_potential_energy = 0.0
+        for i in range(block, num_particles, num_blocks):
+            # particle i's own terms are kept in registers for the whole row
+            xi = pos_x[i]
+            yi = pos_y[i]
+            Gmi = G * masses[i]
+            fxi = np.float32(0.0)
+            fyi = np.float32(0.0)
+            row_potential_energy = np.float32(0.0)
+
+            # views over the partners j > i of this row
+            tail_x = pos_x[i + 1 :]
+            tail_y = pos_y[i + 1 :]
+            tail_masses = masses[i + 1 :]
+            tail_acc_x = acc_x[i + 1 :]
+            tail_acc_y = acc_y[i + 1 :]
+            for j in range(tail_x.shape[0]):
+                # displacement vector from particle i to particle j
+                dx = tail_x[j] - xi
+                dy = tail_y[j] - yi
+
+                # enforce minimum image convention
+                dx -= width * np.rint(dx * inv_width)
+                dy -= height * np.rint(dy * inv_height)
+
+                # U_ij = -G * m_i * m_j / r, and |F| / r = G * m_i * m_j / r^3 absorbs the
+                # normalization of the displacement; both follow from rsqrt(r^2) with no division
+                r2 = dx * dx + dy * dy + eps_squared
+                inv_r = _rsqrt(r2)
+                pair_potential = Gmi * tail_masses[j] * inv_r
+                f = pair_potential * inv_r * inv_r
+                row_potential_energy += pair_potential
+
+                # Newton's 3rd law: F_ij = -F_ji
+                fx = f * dx
+                fy = f * dy
+                fxi += fx
+                fyi += fy
+                tail_acc_x[j] -= fx
+                tail_acc_y[j] -= fy
+
+            acc_x[i] += fxi
+            acc_y[i] += fyi
+            block_potential_energy += row_potential_energy
+
+        potential_energy += -block_potential_energy
+
+    # --- Phase 2: reduce the per-block buffers into the net forces ---
+    for i in prange(num_particles):
+        fx = np.float32(0.0)
+        fy = np.float32(0.0)
+        for block in range(num_blocks):
+            fx += scratch[0, block, i]
+            fy += scratch[1, block, i]
+        out_x[i] = fx
+        out_y[i] = fy
+
+    return potential_energy
+
+@njit("f8(f4[::1], f4[::1], f4[::1], f4, f4, f4, f4, i8)", parallel=True, fastmath=True, boundscheck=False, cache=True)
+def potential_energy_kernel(pos_x: np.ndarray, pos_y: np.ndarray, masses: np.ndarray, width: float, height: float,
+                            G: float, eps_squared: float, num_blocks: int) -> float:
+    """
+    JIT-compiled reduction computing the exact total potential energy of the system,
+    U = -sum over unique pairs (i < j) of G * m_i * m_j / r.
+
+    Used when the last force evaluation did not produce the potential energy as a
+    by-product (GPU forces). Same pair loop as `forces_kernel` without the
+    force accumulation, so it needs no scratch buffers. Rows are dealt out cyclically to
+    `num_blocks` blocks, for the same load balancing reason.
+
+    Args:
+        pos_x (np.ndarray): Particle x coordinates, shape (num_particles,).
+        pos_y (np.ndarray): Particle y coordinates, shape (num_particles,).
+        masses (np.ndarray): Particle masses, shape (num_particles,).
+        width (float): Width of the periodic domain.
+        height (float): Height of the periodic domain.
+        G (float): Gravitational constant.
+        eps_squared (float): Squared softening length.
+        num_blocks (int): Number of row blocks, normally the number of threads.
+
+    Returns:
+        float: The total potential energy of the system.
+    """
+    num_particles = pos_x.shape[0]
+    potential_energy = 0.0
+
+    inv_width = np.float32(1.0) / width
+    inv_height = np.float32(1.0) / height
+
+    for block in prange(num_blocks):
+        block_potential_energy = 0.0
+        for i in range(block, num_particles, num_blocks):
+            xi = pos_x[i]
+            yi = pos_y[i]
+            row_potential_energy = np.float32(0.0)
+
+            # views over the partners j > i of this row, see `forces_kernel`
+            tail_x = pos_x[i + 1 :]
+            tail_y = pos_y[i + 1 :]
+            tail_masses = masses[i + 1 :]
+            for j in range(tail_x.shape[0]):
+                dx = tail_x[j] - xi
+                dy = tail_y[j] - yi
+
+                # enforce minimum image convention
+                dx -= width * np.rint(dx * inv_width)
+                dy -= height * np.rint(dy * inv_height)
+
+                row_potential_energy += tail_masses[j] * _rsqrt(dx * dx + dy * dy + eps_squared)
+
+            block_potential_energy += G * masses[i] * row_potential_energy
+
+        potential_energy += -block_potential_energy
+
+    return potential_energy
+
+@njit("f8(f4[::1], f4[::1], f4[::1])", fastmath=True, cache=True)
+def kinetic_energy_kernel(vel_x: np.ndarray, vel_y: np.ndarray, masses: np.ndarray) -> float:
+    """
+    JIT-compiled reduction computing the total kinetic energy of the system (KE = 0.5 * m * v^2).
+
+    Args:
+        vel_x (np.ndarray): Particle x velocities, shape (num_particles,).
+        vel_y (np.ndarray): Particle y velocities, shape (num_particles,).
+        masses (np.ndarray): Particle masses, shape (num_particles,).
+
+    Returns:
+        float: The total kinetic energy, accumulated in float64.
+    """
+    kinetic_energy = 0.0
+    for i in range(vel_x.shape[0]):
+        kinetic_energy += masses[i] * (vel_x[i] * vel_x[i] + vel_y[i] * vel_y[i])
+    return 0.5 * kinetic_energy
+
+def make_force_scratch(num_particles: int) -> np.ndarray:
+    """
+    Allocates the per-thread accumulation buffer required by `forces_kernel`.
+
+    Args:
+        num_particles (int): The number of bodies being simulated.
+
+    Returns:
+        np.ndarray: A float32 array of shape (2, num_threads, num_particles).
+    """
+    return np.zeros((2, get_num_threads(), num_particles), dtype=np.float32)
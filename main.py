@@ -1,9 +1,11 @@
 import pygame as pg
+import numpy as np
 import argparse
 import sys
-from typing import Optional
+from typing import List, Optional
 
-from constants import SCREEN_WIDTH, SCREEN_HEIGHT, NUM_PARTICLES, RADIUS, LOG_INTERVAL
+from constants import (SCREEN_WIDTH, SCREEN_HEIGHT, NUM_PARTICLES, RADIUS, LOG_INTERVAL, PHYSICS_DT,
+                       MAX_PHYSICS_STEPS_PER_FRAME)
 from particles import Particles
 from simulation_logger import SimulationLogger
 
@@ -15,6 +17,11 @@ def main(profile_enabled: bool) -> None:
     and runs the main game loop which handles events, updates physics,
     and renders the scene.
 
+    Physics is decoupled from rendering: elapsed wall-clock time is accumulated and
+    consumed in fixed `PHYSICS_DT` steps, at most `MAX_PHYSICS_STEPS_PER_FRAME` of them per
+    frame. Each frame only pushes the screen regions covered by the particles (in their
+    previous and current positions) to the display.
+
     Args:
         profile_enabled (bool): If True, runs the simulation under cProfile
                                 and dumps stats to 'particle_sim.prof' on exit.
@@ -37,10 +44,16 @@ def main(profile_enabled: bool) -> None:
     # --- Simulation logger setup ---
     logger = SimulationLogger()
 
-    # --- Timing variables for logging ---
+    # --- Timing variables for physics and logging ---
+    physics_accumulator: float = 0.0
     log_accumulator: float = 0.0
     simulation_time: float = 0.0
 
+    # --- Dirty rectangle tracking ---
+    # screen regions drawn in the previous frame, which must be refreshed to erase the old sprites
+    prev_rects: List[pg.Rect] = []
+    full_redraw: bool = True
+
     # --- Create particle and screen variables ---
     particles = Particles(NUM_PARTICLES, RADIUS)
 
@@ -52,17 +65,29 @@ def main(profile_enabled: bool) -> None:
             for event in pg.event.get():
                 if event.type == pg.QUIT:
                     running = False
+                elif event.type == pg.WINDOWEXPOSED:
+                    full_redraw = True
 
             # --- Retrieve time since last frame ---
             # dt is in seconds. 60 FPS target.
             dt: float = clock.tick(60) / 1000.0
+            physics_accumulator += dt
+
+            # --- Update particle positions in fixed physics steps ---
+            num_steps = 0
+            while physics_accumulator >= PHYSICS_DT and num_steps < MAX_PHYSICS_STEPS_PER_FRAME:
+                particles.step_forward(PHYSICS_DT)
+                physics_accumulator -= PHYSICS_DT
+                num_steps += 1
 
-            # update simulation time
-            simulation_time += dt
-            log_accumulator += dt
+                # update simulation time
+                simulation_time += PHYSICS_DT
+                log_accumulator += PHYSICS_DT
 
-            # --- Update particle positions ---
-            particles.step_forward(dt)
+            # if physics cannot keep up with real time, drop the time still owed rather than
+            # carrying it over, which would make every following frame slower than the last
+            if physics_accumulator >= PHYSICS_DT:
+                physics_accumulator = 0.0
 
             # --- Check for boundary collisions ---
             particles.enforce_periodic_boundary_conditions()
@@ -82,18 +107,19 @@ def main(profile_enabled: bool) -> None:
             # --- Render the game ---
             screen.fill("purple")
 
-            # draw particles
-            for pos in particles.pos:
-                pg.draw.circle(
-                    screen,
-                    "red",
-                    # Pygame requires integer coordinates for drawing, though it often handles floats gracefully.
-                    # Casting to int tuple here is explicit and safe.
-                    (int(pos[0]), int(pos[1])),
-                    particles.radius
-                )
-
-            pg.display.flip()
+            # draw particles by blitting the cached sprite, offset so that it is centered on each particle.
+            # Pygame requires integer coordinates; the conversion is done once for all particles in NumPy,
+            # rounding to the nearest pixel rather than truncating towards zero.
+            offsets = np.rint(particles.pos - particles.radius).astype(np.int32)
+            rects: List[pg.Rect] = screen.blits([(particles.sprite, offset) for offset in offsets.tolist()])
+
+            # only push the regions that changed, unless the whole window needs repainting
+            if full_redraw:
+                pg.display.flip()
+                full_redraw = False
+            else:
+                pg.display.update(prev_rects + rects)
+            prev_rects = rects
 
     except KeyboardInterrupt:
         print('\n--- Simulation stopped by user ---')
@@ -1,212 +1,454 @@
+import math
 import pygame as pg
 import numpy as np
-from scipy.integrate import solve_ivp
-from typing import Tuple
-
-from constants import NUM_DIM, SCREEN_WIDTH, SCREEN_HEIGHT, MASS_LOWER_BOUND, MASS_UPPER_BOUND, EPS_SQUARED, G_SCALED
+from typing import Optional, Tuple
+
+from constants import (DTYPE, SCREEN_WIDTH, SCREEN_HEIGHT, MASS_LOWER_BOUND, MASS_UPPER_BOUND, EPS_SQUARED, G_SCALED,
+                       MAX_TIME_STEP)
+
+# Numba is optional: without it, forces are computed by a pure NumPy fallback
+try:
+    from kernels import forces_kernel, kinetic_energy_kernel, potential_energy_kernel, make_force_scratch
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# The hand-vectorized C kernel is optional too: once libgravkernel.so has been built, it replaces
+# the NumPy fallback when Numba is missing. It is single-threaded, so the Numba kernel is preferred
+try:
+    from gravkernel import CForcesKernel
+    C_KERNEL_AVAILABLE = True
+except ImportError:
+    C_KERNEL_AVAILABLE = False
+
+# The CUDA path needs Numba's CUDA support; whether a device is present is only checked on request
+try:
+    from numba import cuda
+    from gpu_forces import GPUForces
+    CUDA_AVAILABLE = True
+except ImportError:
+    CUDA_AVAILABLE = False
 
 class Particles:
     """
     Handles the physics, state, and numerical integration for a system of N particles
     interacting via softened gravity in a 2D toroidal space.
+
+    State is stored as a structure of arrays: every per-particle quantity is split into
+    one contiguous 1D array per axis (e.g. `pos_x`, `pos_y`), so that per-component
+    operations run on unit-stride memory.
     """
 
-    def __init__(self, num_particles: int = 3, radius: float = 10) -> None:
+    def __init__(self, num_particles: int = 3, radius: float = 10, use_gpu: bool = False) -> None:
         """
         Initializes the particle system with random masses, positions, and velocities.
 
         Args:
             num_particles (int): The number of bodies to simulate.
             radius (float): The display radius of the particles in pixels.
+            use_gpu (bool): Whether `calculate_forces` sums forces exactly on a CUDA GPU. Falls back to
+                            the CPU paths if no device is available.
         """
         self.num_particles = num_particles
-        self.unique_pair_indices: Tuple[np.ndarray, np.ndarray] = np.triu_indices(self.num_particles, k=1)
-        self.num_pos_coords = NUM_DIM * self.num_particles
         self.radius = radius
-        self.screen_dims = np.array((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+        # --- Pre-render the particle sprite once, so drawing a frame is a plain blit per particle ---
+        diameter = int(2 * self.radius)
+        self.sprite: pg.Surface = pg.Surface((diameter, diameter), pg.SRCALPHA)
+        pg.draw.circle(self.sprite, "red", (self.radius, self.radius), self.radius)
 
         # --- Generate random masses ---
-        self.masses: np.ndarray = MASS_LOWER_BOUND + np.random.rand(self.num_particles) * (MASS_UPPER_BOUND - MASS_LOWER_BOUND)
-        
+        self.masses: np.ndarray = (
+            MASS_LOWER_BOUND + np.random.rand(self.num_particles) * (MASS_UPPER_BOUND - MASS_LOWER_BOUND)
+        ).astype(DTYPE)
+
         # --- Start at a random position within screen boundaries ---
-        lower_bound = np.array([self.radius, self.radius])
-        upper_bound = np.array([SCREEN_WIDTH - self.radius, SCREEN_HEIGHT - self.radius])
-        self.pos: np.ndarray = lower_bound + np.random.rand(self.num_particles, NUM_DIM) * (upper_bound - lower_bound)
+        self.pos_x: np.ndarray = np.ascontiguousarray(
+            self.radius + np.random.rand(self.num_particles) * (SCREEN_WIDTH - 2 * self.radius), dtype=DTYPE
+        )
+        self.pos_y: np.ndarray = np.ascontiguousarray(
+            self.radius + np.random.rand(self.num_particles) * (SCREEN_HEIGHT - 2 * self.radius), dtype=DTYPE
+        )
 
         # --- Start with random velocities (in pixels per second) ---
         lower_bound_vel = -150
         upper_bound_vel = 150
-        self.vel: np.ndarray = lower_bound_vel + np.random.rand(self.num_particles, NUM_DIM) * (upper_bound_vel - lower_bound_vel)
+        self.vel_x: np.ndarray = np.ascontiguousarray(
+            lower_bound_vel + np.random.rand(self.num_particles) * (upper_bound_vel - lower_bound_vel), dtype=DTYPE
+        )
+        self.vel_y: np.ndarray = np.ascontiguousarray(
+            lower_bound_vel + np.random.rand(self.num_particles) * (upper_bound_vel - lower_bound_vel), dtype=DTYPE
+        )
 
         # Initialize force and energy containers
-        self.forces: np.ndarray = np.zeros((self.num_particles, NUM_DIM))
+        self.forces_x: np.ndarray = np.zeros(self.num_particles, dtype=DTYPE)
+        self.forces_y: np.ndarray = np.zeros(self.num_particles, dtype=DTYPE)
+        self.accelerations_x: np.ndarray = np.zeros(self.num_particles, dtype=DTYPE)
+        self.accelerations_y: np.ndarray = np.zeros(self.num_particles, dtype=DTYPE)
+        self._force_scratch: Optional[np.ndarray] = make_force_scratch(self.num_particles) if NUMBA_AVAILABLE else None
+        self._c_forces: Optional["CForcesKernel"] = None
+        if C_KERNEL_AVAILABLE and not NUMBA_AVAILABLE:
+            self._c_forces = CForcesKernel(
+                self.pos_x, self.pos_y, self.masses, SCREEN_WIDTH, SCREEN_HEIGHT,
+                G_SCALED, EPS_SQUARED, self.forces_x, self.forces_y
+            )
+        self._full_matrix_scratch: Optional[np.ndarray] = None
+        self._mass_mass: Optional[np.ndarray] = None
+        self._unique_pair_indices: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._pair_scratch: Optional[np.ndarray] = None
+        self._G_mass_prod: Optional[np.ndarray] = None
+
+        # --- Select the force calculation: direct summation on the CPU unless the GPU is requested ---
+        self._gpu_forces: Optional["GPUForces"] = None
+        if use_gpu:
+            if CUDA_AVAILABLE and cuda.is_available():
+                self._gpu_forces = GPUForces(self.masses)
+            else:
+                print('No CUDA device available, computing forces on the CPU')
         self.kinetic_energy: float = 0.0
         self.potential_energy: float = 0.0
         self.total_energy: float = 0.0
+        # potential energy at the positions of the last force evaluation, when that evaluation
+        # could produce it for free (exact direct summation in the C or Numba kernel)
+        self._last_force_potential_energy: Optional[float] = None
+        # squared pair distances of the last force evaluation, kept by the NumPy fallback so that
+        # the potential energy does not have to redo the displacements and minimum image convention
+        self._last_force_r_squared: Optional[np.ndarray] = None
+
+        # Prime accelerations for the initial configuration, so that the first half-kick
+        # of the leapfrog integrator in `step_forward` starts from valid values
+        self.calculate_forces()
+        self.calculate_accelerations()
+
+    @property
+    def pos(self) -> np.ndarray:
+        """
+        Particle positions stacked into a new (num_particles, 2) array.
+        Intended for the rendering loop only; physics code works on `pos_x` and `pos_y`.
+        """
+        return np.stack((self.pos_x, self.pos_y), axis=1)
 
     def enforce_periodic_boundary_conditions(self) -> None:
         """
         Wraps particle positions around the screen edges to maintain a toroidal topology.
+        Positions are wrapped in place, so no new arrays are allocated and `pos_x`/`pos_y`
+        keep their buffers.
         """
-        self.pos = np.mod(self.pos, self.screen_dims)
+        np.mod(self.pos_x, SCREEN_WIDTH, out=self.pos_x)
+        np.mod(self.pos_y, SCREEN_HEIGHT, out=self.pos_y)
 
     def _calculate_forces_full_matrix(self) -> None:
         """
-        DEPRECATED: Calculates forces using a full N x N matrix approach.
+        Calculates forces using a full N x N matrix approach in pure NumPy.
         Kept primarily for benchmarking or educational comparison against the
-        optimized scatter-add approach in `calculate_forces`.
-        """
-        # entry (i,j) is the displacement vector from particle i to particle j, shape (num_particles, num_particles, 2)
-        pairwise_disp = self.pos[np.newaxis, :, :] - self.pos[:, np.newaxis, :]
+        unique-pair approach in `_calculate_forces_unique_pairs`.
 
-        # enforce minimum image convention (to work in concert with periodic boundary conditions)
-        pairwise_disp -= self.screen_dims * np.round(pairwise_disp / self.screen_dims)
+        The normalization of the displacements is absorbed into a single (N, N) scalar
+        coefficient G * m_i * m_j / r^3, and the final multiply-then-sum over j is fused
+        into one `np.einsum` contraction per axis, so no extra (N, N) product is materialized.
+        """
+        # (N, N) scratch buffers are allocated on first use only, since this method is not on the hot path,
+        # then reused in place on every subsequent call
+        if self._full_matrix_scratch is None:
+            self._full_matrix_scratch = np.empty((4, self.num_particles, self.num_particles), dtype=DTYPE)
+
+            # masses never change, so their pairwise products are computed once. A zero diagonal
+            # makes self-interactions vanish without relying on the softening length
+            self._mass_mass = np.outer(self.masses, self.masses)
+            np.fill_diagonal(self._mass_mass, 0.0)
+
+        pairwise_disp_x, pairwise_disp_y, r_squared, coeff = self._full_matrix_scratch
+
+        # entry (i,j) is the displacement from particle i to particle j, shape (num_particles, num_particles)
+        np.subtract(self.pos_x[np.newaxis, :], self.pos_x[:, np.newaxis], out=pairwise_disp_x)
+        np.subtract(self.pos_y[np.newaxis, :], self.pos_y[:, np.newaxis], out=pairwise_disp_y)
+
+        # enforce minimum image convention (to work in concert with periodic boundary conditions),
+        # using `coeff` as a temporary before it is filled
+        for disp, length in ((pairwise_disp_x, SCREEN_WIDTH), (pairwise_disp_y, SCREEN_HEIGHT)):
+            np.divide(disp, length, out=coeff)
+            np.round(coeff, out=coeff)
+            coeff *= length
+            disp -= coeff
 
         # entry (i,j) is the squared distance between particles i and j, shape (num_particles, num_particles)
-        # EPS must be summed to r_squared instead of pairwise_dist to avoid fictitous self-forces
-        r_squared = np.sum(np.square(pairwise_disp), axis=2) + EPS_SQUARED
-        
-        # normalize array of displacements
-        pairwise_disp /= np.sqrt(r_squared)[:, :, np.newaxis]
+        np.einsum('ij,ij->ij', pairwise_disp_x, pairwise_disp_x, out=r_squared)
+        np.einsum('ij,ij->ij', pairwise_disp_y, pairwise_disp_y, out=coeff)
+        r_squared += coeff
+        r_squared += EPS_SQUARED
+
+        # entry (i,j) is G * m_i * m_j / r^3, i.e. the force magnitude divided by the distance
+        np.sqrt(r_squared, out=coeff)
+        coeff *= r_squared
+        np.divide(G_SCALED, coeff, out=coeff)
+        coeff *= self._mass_mass
+
+        # contract along the row to get the total force on particle i
+        np.einsum('ij,ij->i', coeff, pairwise_disp_x, out=self.forces_x)
+        np.einsum('ij,ij->i', coeff, pairwise_disp_y, out=self.forces_y)
+
+    def _pair_displacements(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the minimum image displacement vectors from particle i to particle j
+        for all unique pairs (i, j) where i < j, without allocating new arrays.
 
-        # entry (i,j) is the product of the masses of particle i and particle j, shape (num_particles, num_particles)
-        pairwise_mass_prod = self.masses[:, np.newaxis] * self.masses[np.newaxis, :]
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The x and y displacements, shape (num_pairs,). Both are views
+                                           of a scratch buffer that is overwritten on the next call.
+        """
+        # the pair indices and (num_pairs,) scratch buffers are only used by the NumPy pair paths, which
+        # run when Numba is not installed, so they are allocated on first use, then reused in place on
+        # every subsequent call. Scratch rows are the x and y displacements, a temporary, and the squared
+        # distances and force coefficients of `_calculate_forces_unique_pairs`
+        if self._pair_scratch is None:
+            self._unique_pair_indices = np.triu_indices(self.num_particles, k=1)
+            i_indices, j_indices = self._unique_pair_indices
+            self._pair_scratch = np.empty((5, i_indices.shape[0]), dtype=DTYPE)
+
+            # masses never change, so the G * m_i * m_j factor of every unique pair is computed once
+            self._G_mass_prod = G_SCALED * self.masses[i_indices] * self.masses[j_indices]
+        i_indices, j_indices = self._unique_pair_indices
+        pairwise_disp_x, pairwise_disp_y, tmp = self._pair_scratch[:3]
+
+        # gather the particle coordinates of every pair straight into the scratch buffers
+        for disp, coords in ((pairwise_disp_x, self.pos_x), (pairwise_disp_y, self.pos_y)):
+            np.take(coords, j_indices, out=disp, mode='clip')
+            np.take(coords, i_indices, out=tmp, mode='clip')
+            disp -= tmp
 
-        # entry (i,j) is the magnitude of the scaled gravitational force pointing from particle i to particle j
-        force_magnitudes = G_SCALED * pairwise_mass_prod / r_squared
+        # enforce minimum image convention (to work in concert with periodic boundary conditions)
+        for disp, length in ((pairwise_disp_x, SCREEN_WIDTH), (pairwise_disp_y, SCREEN_HEIGHT)):
+            np.divide(disp, length, out=tmp)
+            np.rint(tmp, out=tmp)
+            tmp *= length
+            disp -= tmp
 
-        # sum along the row to get the total force on particle i
-        self.forces = np.sum(force_magnitudes[:, :, np.newaxis] * pairwise_disp, axis=1)
+        return pairwise_disp_x, pairwise_disp_y
 
-    def calculate_forces(self) -> None:
+    def _calculate_forces_unique_pairs(self) -> None:
         """
-        Calculates net gravitational forces on all particles.
-        
-        Uses a vectorized scatter-add approach to sum forces only between unique pairs,
-        improving performance over the full matrix approach.
-        """
-        # reset forces to zero before accumulating
-        self.forces = np.zeros((self.num_particles, NUM_DIM))
+        Calculates net gravitational forces on all particles in pure NumPy.
+        Used as the fallback for `calculate_forces` when no compiled kernel is available.
 
-        # get indices for all unique pairs (i,j) where i < j
-        i_indices, j_indices = self.unique_pair_indices
+        Uses a vectorized segmented-sum approach to sum forces only between unique pairs,
+        halving the work of the full matrix approach by exploiting Newton's third law.
+        Every pairwise intermediate is written in place into the preallocated pair scratch buffers.
+        """
+        # displacement vector from particle i to particle j, under the minimum image convention
+        pairwise_disp_x, pairwise_disp_y = self._pair_displacements()
 
-        # calculate displacement vector from particle i to particle j
-        pairwise_disp = self.pos[j_indices] - self.pos[i_indices]
+        # indices of all unique pairs (i,j) where i < j, built along with the pair scratch
+        i_indices, j_indices = self._unique_pair_indices
+        tmp, r_squared, coeff = self._pair_scratch[2:]
 
-        # enforce minimum image convention (to work in concert with periodic boundary conditions)
-        pairwise_disp -= self.screen_dims * np.round(pairwise_disp / self.screen_dims)
-        
         # array of squared distances between any two particles forming a unique pair
-        r_squared = np.sum(np.square(pairwise_disp), axis=1) + EPS_SQUARED
-
-        # normalize array of displacements
-        pairwise_disp /= np.sqrt(r_squared)[:, np.newaxis]
-
-        # calculate mass products for unique pairs
-        pairwise_mass_prod = self.masses[i_indices] * self.masses[j_indices]
+        np.square(pairwise_disp_x, out=r_squared)
+        np.square(pairwise_disp_y, out=tmp)
+        r_squared += tmp
+        r_squared += EPS_SQUARED
+
+        # array of G * m_i * m_j / r^3 coefficients, absorbing the normalization of the displacements
+        np.sqrt(r_squared, out=coeff)
+        coeff *= r_squared
+        np.divide(self._G_mass_prod, coeff, out=coeff)
+
+        # arrays of forces exerted by particle j on particle i in each pair (i,j),
+        # overwriting the displacements that are no longer needed
+        pairwise_disp_x *= coeff
+        pairwise_disp_y *= coeff
+        pair_forces_x, pair_forces_y = pairwise_disp_x, pairwise_disp_y
+
+        # Aggregate forces (Newton's 3rd law: F_ij = -F_ji). np.bincount is a compiled segmented sum,
+        # far faster than the unbuffered np.add.at scatter
+        n = self.num_particles
+        np.subtract(np.bincount(i_indices, pair_forces_x, n), np.bincount(j_indices, pair_forces_x, n), out=self.forces_x)
+        np.subtract(np.bincount(i_indices, pair_forces_y, n), np.bincount(j_indices, pair_forces_y, n), out=self.forces_y)
+
+        self._last_force_r_squared = r_squared
 
-        # array of force magnitudes between any two particles forming a unique pair
-        force_magnitudes = G_SCALED * pairwise_mass_prod / r_squared
-
-        # array of forces exerted by particle j on particle i in each pair (i,j)
-        pair_forces = force_magnitudes[:, np.newaxis] * pairwise_disp
+    def calculate_forces(self) -> None:
+        """
+        Calculates net gravitational forces on all particles.
 
-        # Aggregate forces (Newton's 3rd law: F_ij = -F_ji)
-        np.add.at(self.forces, i_indices, pair_forces)
-        np.add.at(self.forces, j_indices, -pair_forces)
+        If a GPU was requested and found, forces are summed exactly on the GPU. Otherwise they are
+        summed exactly by the multithreaded JIT-compiled `forces_kernel`, or, without Numba, by the
+        single-threaded AVX2 C kernel if it has been built. Both write directly into the preallocated
+        `self.forces_x` and `self.forces_y` buffers instead of building pairwise temporaries, and return
+        the potential energy as a by-product. Without either, falls back to `_calculate_forces_unique_pairs`.
+        """
+        self._last_force_potential_energy = None
+        self._last_force_r_squared = None
+        if self._gpu_forces is not None:
+            self._gpu_forces.compute_forces(
+                self.pos_x, self.pos_y, SCREEN_WIDTH, SCREEN_HEIGHT, G_SCALED, EPS_SQUARED,
+                self.forces_x, self.forces_y
+            )
+        elif NUMBA_AVAILABLE:
+            self._last_force_potential_energy = forces_kernel(
+                self.pos_x, self.pos_y, self.masses, SCREEN_WIDTH, SCREEN_HEIGHT,
+                G_SCALED, EPS_SQUARED, self._force_scratch, self.forces_x, self.forces_y
+            )
+        elif self._c_forces is not None:
+            self._last_force_potential_energy = self._c_forces()
+        else:
+            self._calculate_forces_unique_pairs()
 
     def calculate_accelerations(self) -> None:
         """
         Computes accelerations for all particles based on currently accumulated forces.
+        Writes into the existing `accelerations_x`/`accelerations_y` buffers rather than rebinding them.
         """
-        self.accelerations = self.forces / self.masses[:, np.newaxis]
+        np.divide(self.forces_x, self.masses, out=self.accelerations_x)
+        np.divide(self.forces_y, self.masses, out=self.accelerations_y)
 
     def step_forward(self, dt: float) -> None:
         """
-        Advances the simulation by `dt` seconds using the RK45 integrator.
+        Advances the simulation by `dt` seconds using the velocity Verlet (kick-drift-kick leapfrog) integrator.
+
+        The scheme is symplectic, so energy errors stay bounded instead of drifting, and it needs
+        only one force evaluation per step: the accelerations computed at the end of a step are
+        kept and reused for the opening half-kick of the next one. Being fixed-step, `dt` is split
+        into equal sub-steps no longer than `MAX_TIME_STEP` to keep close encounters stable.
 
         Args:
             dt (float): The time step in seconds.
         """
-        # flattened array of initial posiitons and velocities
-        init_state = np.concatenate((self.pos.flatten(), self.vel.flatten()))
+        num_substeps = max(1, math.ceil(dt / MAX_TIME_STEP))
 
-        # use robust Runge-Kutte 5(4) integrator
-        sol = solve_ivp(
-            fun=self.derivative,
-            t_span=(0, dt),
-            y0=init_state,
-            t_eval=[dt],
-            rtol=1e-6, # tighter relative tolerance
-            atol=1e-9  # tighter absolute tolerance
-        )
+        # keep all state updates in DTYPE
+        h = DTYPE(dt / num_substeps)
+        half_h = DTYPE(0.5 * h)
+
+        for _ in range(num_substeps):
+            # half-kick with the accelerations left over from the previous step
+            self.vel_x += half_h * self.accelerations_x
+            self.vel_y += half_h * self.accelerations_y
 
-        # Extract final state from the solution
-        final_state_flat = sol.y[:, 0]
+            # drift
+            self.pos_x += h * self.vel_x
+            self.pos_y += h * self.vel_y
 
-        # slice and reshape to obtain final positions and velocities
-        self.pos = final_state_flat[0 : self.num_pos_coords].reshape(self.num_particles, NUM_DIM)
-        self.vel = final_state_flat[self.num_pos_coords :].reshape(self.num_particles, NUM_DIM) 
+            # re-evaluate accelerations at the new positions
+            self.calculate_forces()
+            self.calculate_accelerations()
 
-    def derivative(self, t: float, y_flat: np.ndarray) -> np.ndarray:
+            # closing half-kick
+            self.vel_x += half_h * self.accelerations_x
+            self.vel_y += half_h * self.accelerations_y
+
+    def _step_rk45(self, dt: float) -> None:
         """
-        Calculates the state derivative (velocities and accelerations) for the N-body system.
-        Required by `scipy.integrate.solve_ivp`.
+        Advances the simulation by `dt` seconds using SciPy's adaptive Runge-Kutta 5(4) integrator.
+        Kept for correctness comparison against `step_forward` only; requires SciPy.
 
         Args:
-            t (float): Current simulation time (unused but required by signature).
-            y_flat (np.ndarray): Flattened state vector [x1, y1, ... v1_x, v1_y, ...].
-
-        Returns:
-            np.ndarray: Flattened derivative vector [v1_x, v1_y, ... a1_x, a1_y, ...].
+            dt (float): The time step in seconds.
         """
-        # --- Unpack the 1D state array y_flat ---
-        current_pos = y_flat[0 : self.num_pos_coords].reshape(self.num_particles, NUM_DIM)
-        current_vel = y_flat[self.num_pos_coords :].reshape(self.num_particles, NUM_DIM)
+        from scipy.integrate import solve_ivp
+
+        n = self.num_particles
+
+        def derivative(t: float, y_flat: np.ndarray) -> np.ndarray:
+            # flattened state is [x..., y..., vx..., vy...]; positions are copied (and cast to DTYPE)
+            # into the existing buffers before evaluating the forces.
+            # The result must be a new array: RK45 keeps the last derivative it was given and reuses
+            # it to retry rejected steps, so filling a persistent buffer would corrupt the integration.
+            self.pos_x[:] = y_flat[0 : n]
+            self.pos_y[:] = y_flat[n : 2 * n]
+            self.calculate_forces()
+            self.calculate_accelerations()
+            return np.concatenate((y_flat[2 * n :], self.accelerations_x, self.accelerations_y))
+
+        # the final state is read from the last accepted step, instead of interpolating it with t_eval
+        sol = solve_ivp(
+            fun=derivative,
+            t_span=(0, dt),
+            y0=np.concatenate((self.pos_x, self.pos_y, self.vel_x, self.vel_y)),
+            rtol=1e-6,
+            atol=1e-9
+        )
+        final_state_flat = sol.y[:, -1]
+        self.pos_x[:] = final_state_flat[0 : n]
+        self.pos_y[:] = final_state_flat[n : 2 * n]
+        self.vel_x[:] = final_state_flat[2 * n : 3 * n]
+        self.vel_y[:] = final_state_flat[3 * n :]
 
-        # --- Calculate rates of change ---
-        # We use current_pos from the integrator to calculate new forces/accelerations
-        self.pos = current_pos
+        # leave accelerations consistent with the final positions, as `step_forward` expects
         self.calculate_forces()
         self.calculate_accelerations()
 
-        return np.concatenate((current_vel.flatten(), self.accelerations.flatten()))
-
     def calculate_kinetic_energy(self) -> None:
-        """Calculates the total kinetic energy of the system (KE = 0.5 * m * v^2)."""
-        self.kinetic_energy = 0.5 * np.sum(self.masses * np.sum(np.square(self.vel), axis=1))
+        """Calculates the total kinetic energy of the system (KE = 0.5 * m * v^2), accumulated in float64."""
+        if NUMBA_AVAILABLE:
+            self.kinetic_energy = kinetic_energy_kernel(self.vel_x, self.vel_y, self.masses)
+        else:
+            self.kinetic_energy = 0.5 * np.sum(self.masses * (np.square(self.vel_x) + np.square(self.vel_y)), dtype=np.float64)
 
     def calculate_potential_energy(self) -> None:
         """
         Calculates the total gravitational potential energy of the system.
-        Sums interactions only between unique pairs (i < j).
-        """
-        # get indices for all unique pairs (i,j) where i < j
-        i_indices, j_indices = self.unique_pair_indices
+        Sums interactions only between unique pairs (i < j), accumulating in float64
+        to keep the energy log free of single precision round-off.
 
-        # calculate displacements for just these pairs
-        pairwise_disp = self.pos[i_indices] - self.pos[j_indices]
+        With Numba, this is a compiled pass over the pairs that allocates nothing; it is what
+        the energy log uses in GPU mode, whose force evaluations do not produce
+        the potential energy. Otherwise falls back to NumPy over the pair scratch buffers.
+        """
+        if NUMBA_AVAILABLE:
+            self.potential_energy = potential_energy_kernel(
+                self.pos_x, self.pos_y, self.masses, SCREEN_WIDTH, SCREEN_HEIGHT, G_SCALED, EPS_SQUARED,
+                self._force_scratch.shape[1]
+            )
+            return
+
+        # calculate displacements for just the unique pairs (i,j) where i < j
+        pairwise_disp_x, pairwise_disp_y = self._pair_displacements()
+
+        # array of squared distances between any two particles forming a unique pair,
+        # built in place in the scratch temporary
+        r_squared = self._pair_scratch[2]
+        np.square(pairwise_disp_x, out=r_squared)
+        np.square(pairwise_disp_y, out=pairwise_disp_y)
+        r_squared += pairwise_disp_y
+        r_squared += EPS_SQUARED
+
+        self.potential_energy = self._sum_pair_potentials(r_squared)
+
+    def _sum_pair_potentials(self, r_squared: np.ndarray) -> float:
+        """
+        Sums the pair potentials U = -G * m_i * m_j / r over all unique pairs, in float64.
 
-        # enforce minimum image convention
-        pairwise_disp -= self.screen_dims * np.round(pairwise_disp / self.screen_dims)
+        Args:
+            r_squared (np.ndarray): Softened squared distance of every unique pair, shape (num_pairs,).
+                                    Left untouched unless it is the scratch temporary itself.
 
-        # array of distances between any two particles forming a unique pair
-        r = np.sqrt(np.sum(np.square(pairwise_disp), axis=1) + EPS_SQUARED)
-        
-        # calculate mass products for unique pairs
-        pairwise_mass_prod = self.masses[i_indices] * self.masses[j_indices]
-        
-        # U = -G * m1 * m2 / r
-        pair_potential = -G_SCALED * pairwise_mass_prod / r
-        
-        self.potential_energy = np.sum(pair_potential) 
+        Returns:
+            float: The total potential energy of the system.
+        """
+        pair_potential = self._pair_scratch[2]
+        np.sqrt(r_squared, out=pair_potential)
+        np.divide(self._G_mass_prod, pair_potential, out=pair_potential)
+        return -np.sum(pair_potential, dtype=np.float64)
 
     def calculate_total_energy(self) -> None:
         """
         Sums kinetic and potential energy to update self.total_energy.
         Should be called after a step_forward completes.
+
+        `step_forward` ends with a force evaluation at the current positions, so when the
+        force kernel already produced the potential energy it is reused instead of summing
+        all pairs again. The NumPy fallback instead leaves its squared pair distances behind,
+        which only need a square root and a division per pair. Periodic wrapping does not
+        change either, thanks to the minimum image convention.
+
+        The kinetic energy is not fused into the force pass: with leapfrog, forces are evaluated
+        between the two half kicks, when the velocities are not yet synchronized with the positions.
         """
         self.calculate_kinetic_energy()
-        self.calculate_potential_energy()
+        if self._last_force_potential_energy is not None:
+            self.potential_energy = self._last_force_potential_energy
+        elif self._last_force_r_squared is not None:
+            self.potential_energy = self._sum_pair_potentials(self._last_force_r_squared)
+        else:
+            self.calculate_potential_energy()
         self.total_energy = self.potential_energy + self.kinetic_energy
\ No newline at end of file
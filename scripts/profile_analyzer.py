@@ -1,7 +1,24 @@
 import pstats
 import argparse
+import functools
+import os
 import sys
 
+@functools.lru_cache(maxsize=8)
+def _load(stats_file: str, mtime: float) -> pstats.Stats:
+    """
+    Parses a cProfile output file, caching the result for repeated analyses in the same process
+    (e.g. a script calling `analyze_profile` several times; the command line runs it only once).
+
+    Args:
+        stats_file (str): Path to the standard cProfile binary output file.
+        mtime (float): Modification time of the file, so that a rewritten file is parsed again.
+
+    Returns:
+        pstats.Stats: The parsed statistics.
+    """
+    return pstats.Stats(stats_file)
+
 def analyze_profile(stats_file: str) -> None:
     """
     Loads and prints formatted statistics from a cProfile output file.
@@ -15,8 +32,10 @@ def analyze_profile(stats_file: str) -> None:
         stats_file (str): Path to the standard cProfile binary output file.
     """
     try:
-        # load the stats file
-        stats = pstats.Stats(stats_file)
+        # load the stats file, reusing the parsed copy when it has not changed since the last call
+        stats = _load(stats_file, os.path.getmtime(stats_file))
+        # pstats.Stats binds sys.stdout when it is created, so point the cached copy at the current one
+        stats.stream = sys.stdout
     except FileNotFoundError:
         print(f"Error: File not found at '{stats_file}'")
         sys.exit(1)
@@ -1,10 +1,14 @@
 import csv
+import numpy as np
 from typing import Optional, TextIO
-from constants import ENERGY_LOG_FILENAME
+from constants import ENERGY_LOG_FILENAME, LOG_BATCH_SIZE
 
 class SimulationLogger:
     """
     Handles logging of simulation data (time and energy metrics) to a CSV file.
+
+    Rows are collected in a preallocated buffer and written in batches of `LOG_BATCH_SIZE`,
+    so that formatting and file writes stay out of the simulation loop most of the time.
     """
 
     def __init__(self) -> None:
@@ -17,6 +21,8 @@ class SimulationLogger:
         """
         self.file: Optional[TextIO] = None
         self.writer: Optional[csv.writer] = None
+        self._buffer: np.ndarray = np.empty((LOG_BATCH_SIZE, 4), dtype=np.float64)
+        self._num_buffered: int = 0
 
         try:
             # newline='' is recommended for csv module to let it handle line endings
@@ -31,7 +37,8 @@ class SimulationLogger:
 
     def log(self, time: float, kinetic_energy: float, potential_energy: float, total_energy: float) -> None:
         """
-        Writes a single row of energy data to the log file if the writer is active.
+        Buffers a single row of energy data, flushing the buffer to the log file once it is full.
+        Does nothing if the writer is not active.
 
         Args:
             time (float): Current simulation time in seconds.
@@ -40,12 +47,24 @@ class SimulationLogger:
             total_energy (float): Sum of kinetic and potential energy.
         """
         if self.writer:
-            self.writer.writerow((time, kinetic_energy, potential_energy, total_energy))
+            self._buffer[self._num_buffered] = (time, kinetic_energy, potential_energy, total_energy)
+            self._num_buffered += 1
+            if self._num_buffered == LOG_BATCH_SIZE:
+                self._flush()
+
+    def _flush(self) -> None:
+        """
+        Writes all buffered rows to the log file in a single call and empties the buffer.
+        """
+        self.writer.writerows(self._buffer[:self._num_buffered].tolist())
+        self._num_buffered = 0
 
     def close(self) -> None:
         """
-        Safely closes the log file if it is open.
+        Writes any rows still buffered, then safely closes the log file if it is open.
         """
+        if self.writer and self._num_buffered:
+            self._flush()
         if self.file:
             self.file.close()
             self.file = None
\ No newline at end of file